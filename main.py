@@ -6,35 +6,293 @@ Final Ambulance Detection System
 
 import cv2
 import os
+import queue
 import time
 import threading
-from collections import deque
+from collections import OrderedDict, deque
 import logging
 
 # Make sure you have installed the necessary packages:
 # pip install opencv-python ultralytics
 
+import numpy as np
+import torch
+from numba import njit
 from ultralytics import YOLO
+from ultralytics.utils import ops
+
+# Setup for logging system events, done once at import rather than per detector instance
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+_logger = logging.getLogger(__name__)
+
+# Longest side of the inference input, matching the size the model was trained at.
+MODEL_INPUT_SIZE = 640
+# Stride of the YOLOv8 backbone; input dimensions must be a multiple of it.
+MODEL_STRIDE = 32
+# Number of frames sent to the model per call when reading from a video file.
+FILE_BATCH_SIZE = 8
+# Capacity of the queues between the reader, inference and display stages.
+PIPELINE_QUEUE_SIZE = 4
+# Seconds to wait for the display stage to drain its queue on shutdown.
+DISPLAY_JOIN_TIMEOUT = 5.0
+# Seconds the signal stays GREEN after an emergency is triggered.
+EMERGENCY_DURATION = 30.0
+# Maximum number of pre-rendered text patches kept by AmbulanceDetectionSystem._put_cached.
+TEXT_CACHE_SIZE = 128
+
+
+def is_live_source(source):
+    """
+    Tells whether a video source is live (webcam or network stream) rather than a video file.
+
+    Live sources are processed one frame at a time and only their newest frame is kept.
+
+    Args:
+        source (int or str): Video source. 0 for webcam, or a path to a video file.
+    """
+    return isinstance(source, int) or str(source).startswith(('rtsp://', 'http://', 'https://'))
+
+
+def get_inference_shape(source, max_side=MODEL_INPUT_SIZE):
+    """
+    Computes a fixed (height, width) inference shape for a video source.
+
+    The capture frame is scaled so its longest side is `max_side` and then
+    padded up to a multiple of the model stride, which is the same shape the
+    Ultralytics letterbox would pick for that frame on every call.
+
+    Args:
+        source (int or str): Video source. 0 for webcam, or a path to a video file.
+        max_side (int): Longest side of the inference input.
+
+    Returns:
+        A (height, width) tuple, or `max_side` if the source cannot be probed.
+    """
+    cap = cv2.VideoCapture(source)
+    width = cap.get(cv2.CAP_PROP_FRAME_WIDTH)
+    height = cap.get(cv2.CAP_PROP_FRAME_HEIGHT)
+    cap.release()
+    if not width or not height:
+        return max_side
+
+    scale = max_side / max(width, height)
+    new_h = int(round(height * scale))
+    new_w = int(round(width * scale))
+    return (-(-new_h // MODEL_STRIDE) * MODEL_STRIDE, -(-new_w // MODEL_STRIDE) * MODEL_STRIDE)
+
+
+class CudaVideoCapture:
+    """
+    Minimal cv2.VideoCapture replacement that decodes video files on the GPU (NVDEC).
+
+    Requires OpenCV built with CUDA and the cudacodec module. Frames are converted
+    to BGR on the GPU and downloaded, so callers get the same arrays as from
+    cv2.VideoCapture.read().
+    """
+
+    def __init__(self, source):
+        self.reader = cv2.cudacodec.createVideoReader(source)
+
+    def isOpened(self):
+        return self.reader is not None
+
+    def read(self):
+        ret, gpu_frame = self.reader.nextFrame()
+        if not ret:
+            return False, None
+        if gpu_frame.channels() == 4:
+            gpu_frame = cv2.cuda.cvtColor(gpu_frame, cv2.COLOR_BGRA2BGR)
+        return True, gpu_frame.download()
+
+    def grab(self):
+        return self.reader.grab()
+
+    def set(self, prop_id, value):
+        # The hardware decoder has no capture properties to tune
+        return False
+
+    def release(self):
+        self.reader = None
+
+
+def open_video_capture(source):
+    """
+    Opens a video source, decoding files with NVDEC when OpenCV supports it.
+
+    Args:
+        source (int or str): Video source. 0 for webcam, or a path to a video file.
+
+    Returns:
+        A CudaVideoCapture for video files on CUDA-enabled OpenCV builds, otherwise a cv2.VideoCapture.
+    """
+    if (isinstance(source, str) and os.path.isfile(source) and hasattr(cv2, 'cudacodec')
+            and cv2.cuda.getCudaEnabledDeviceCount() > 0):
+        try:
+            return CudaVideoCapture(source)
+        except cv2.error:
+            pass
+    return cv2.VideoCapture(source)
+
+
+@njit(cache=True, fastmath=True)
+def _filter_boxes(xyxy, conf, cls, thr, cls_id, gain, pad_x, pad_y, width, height):
+    """
+    Keeps boxes of class `cls_id` with confidence above `thr` and maps them back to the source frame.
+
+    Args:
+        xyxy: (N, 4) float32 boxes in letterboxed input coordinates.
+        conf: (N,) float32 confidences.
+        cls: (N,) int32 class ids.
+        thr (float): Minimum confidence (exclusive).
+        cls_id (int): Class id to keep.
+        gain (float): Letterbox scale factor.
+        pad_x, pad_y (int): Letterbox left and top padding.
+        width, height (int): Source frame size used to clip the boxes.
+
+    Returns:
+        A (M, 4) int32 array of boxes and a (M,) float32 array of their confidences.
+    """
+    n = conf.shape[0]
+    out_xyxy = np.empty((n, 4), dtype=np.int32)
+    out_conf = np.empty(n, dtype=np.float32)
+    keep = 0
+    for i in range(n):
+        if conf[i] > thr and cls[i] == cls_id:
+            out_xyxy[keep, 0] = int(min(max((xyxy[i, 0] - pad_x) / gain, 0.0), width))
+            out_xyxy[keep, 1] = int(min(max((xyxy[i, 1] - pad_y) / gain, 0.0), height))
+            out_xyxy[keep, 2] = int(min(max((xyxy[i, 2] - pad_x) / gain, 0.0), width))
+            out_xyxy[keep, 3] = int(min(max((xyxy[i, 3] - pad_y) / gain, 0.0), height))
+            out_conf[keep] = conf[i]
+            keep += 1
+    return out_xyxy[:keep], out_conf[:keep]
+
+
+def _export_cache_path(model_path, imgsz, batch, suffix):
+    """
+    Builds the cache path of an exported model, keyed on its static batch and input shape.
+
+    A static export only accepts the shape it was built for, so models exported
+    for different sources must not share a cache entry.
+    """
+    height, width = (imgsz, imgsz) if isinstance(imgsz, int) else imgsz
+    return f"{os.path.splitext(model_path)[0]}_b{batch}_{height}x{width}{suffix}"
+
+
+def export_tensorrt_engine(model_path, imgsz, batch=1):
+    """
+    Exports the model to an FP16 TensorRT engine once and caches it next to the weights.
+
+    Args:
+        model_path (str): Path to the custom-trained YOLOv8 model (best.pt).
+        imgsz (int or tuple): Static inference shape the engine is built for.
+        batch (int): Static batch size the engine is built for.
+
+    Returns:
+        Path to the engine file, or None if TensorRT is unavailable.
+    """
+    engine_path = _export_cache_path(model_path, imgsz, batch, ".engine")
+    if os.path.exists(engine_path):
+        return engine_path
+    if not torch.cuda.is_available():
+        return None
+
+    print("⚙️  Exporting TensorRT engine (one-time, this may take a few minutes)...")
+    try:
+        exported = YOLO(model_path).export(format="engine", half=True, imgsz=imgsz, batch=batch,
+                                           device=0, dynamic=False, workspace=4)
+        os.replace(exported, engine_path)
+        return engine_path
+    except Exception as e:
+        print(f"⚠️  TensorRT export failed, falling back to PyTorch: {e}")
+        return None
+
+
+def export_openvino_model(model_path, imgsz, batch=1):
+    """
+    Exports the model to an FP32 OpenVINO model once and caches it next to the weights.
+
+    Used on machines without a CUDA GPU, where OpenVINO's fused CPU kernels are
+    much faster than running the PyTorch model directly.
+
+    Args:
+        model_path (str): Path to the custom-trained YOLOv8 model (best.pt).
+        imgsz (int or tuple): Static inference shape the model is exported for.
+        batch (int): Static batch size the model is exported for.
+
+    Returns:
+        Path to the OpenVINO model directory, or None if the export fails.
+    """
+    openvino_path = _export_cache_path(model_path, imgsz, batch, "_openvino_model")
+    if os.path.isdir(openvino_path):
+        return openvino_path
+
+    print("⚙️  Exporting OpenVINO model (one-time)...")
+    try:
+        exported = YOLO(model_path).export(format="openvino", half=False, imgsz=imgsz, batch=batch,
+                                           dynamic=False)
+        os.replace(exported, openvino_path)
+        return openvino_path
+    except Exception as e:
+        print(f"⚠️  OpenVINO export failed, falling back to PyTorch: {e}")
+        return None
 
 class AmbulanceDetectionSystem:
-    def __init__(self, model_path, confidence_threshold=0.7):
+    def __init__(self, model_path, confidence_threshold=0.7, imgsz=MODEL_INPUT_SIZE, batch_size=1,
+                 frame_stride=1):
         """
         Initializes the system with a custom-trained model.
 
         Args:
-            model_path (str): Path to the custom-trained YOLOv8 model (best.pt).
+            model_path (str): Path to the custom-trained YOLOv8 model (best.pt), or a TensorRT engine / OpenVINO model exported from it.
             confidence_threshold (float): Minimum confidence for a detection to be valid.
+            imgsz (int or tuple): Inference input size. Must match the shape an exported model was built with.
+            batch_size (int): Frames per inference call for video files. Must match an exported model's batch.
+            frame_stride (int): Process every Nth frame of a video file; the frames in between are skipped.
         """
 
+        self.logger = _logger
+
         # Load the custom-trained YOLOv8 model
-        self.model = YOLO(model_path)
+        self.model = YOLO(model_path, task="detect")
+        self.imgsz = imgsz
+        # (height, width) of the letterboxed model input
+        self.input_shape = (imgsz, imgsz) if isinstance(imgsz, int) else tuple(imgsz)
+        # Letterbox geometry for the current source resolution, computed on the first frame
+        self._letterbox_params = None
+        self.batch_size = batch_size
+        # Exported models (TensorRT, OpenVINO) and captured CUDA graphs only accept exactly `batch_size` frames per call
+        self.static_batch = not model_path.endswith('.pt')
+        self.frame_stride = max(1, frame_stride)
+
+        # Run in FP16 on GPUs with tensor cores (Volta and newer); Pascal and older gain nothing from half precision
+        self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        self.half = self.device == 'cuda' and torch.cuda.get_device_capability() >= (7, 0)
+
+        # Resolve the ambulance class once so detections can be filtered by integer id
+        self.ambulance_cls_id = next((k for k, v in self.model.names.items() if v.lower() == 'ambulance'), -1)
+        if self.ambulance_cls_id < 0:
+            self.logger.warning(f"Model has no 'ambulance' class (classes: {list(self.model.names.values())}); "
+                                "no detections will be reported")
+
+        # Compile the box filter now (or load it from the Numba cache) rather than on the first frame
+        _filter_boxes(np.zeros((1, 4), dtype=np.float32), np.zeros(1, dtype=np.float32),
+                      np.zeros(1, dtype=np.int32), 0.5, 0, 1.0, 0, 0, 1, 1)
+
+        # Label styling; every label has the same "AMBULANCE 0.00" layout, so its size is measured once
+        self.font = cv2.FONT_HERSHEY_SIMPLEX
+        self.label_size = cv2.getTextSize("AMBULANCE 0.00", self.font, 0.6, 2)[0]
+
         self.confidence_threshold = confidence_threshold
         self.emergency_active = False
         self.traffic_signal_state = "RED"
         
-        # Setup for logging system events
-        logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-        self.logger = logging.getLogger(__name__)
+        # Monotonic time at which an active emergency is reset, checked once per frame
+        self._emergency_until = 0.0
+        
+        # Dark layer blended under the status panel; covers the (width - 300, 10)-(width - 10, 120) rectangle
+        self._dark = np.zeros((111, 291, 3), dtype=np.uint8)
+        # Pre-rendered text patches for _put_cached, in least-recently-used order
+        self._txt_cache = OrderedDict()
         
         # Dictionary to hold system statistics
         self.stats = {
@@ -42,6 +300,48 @@ class AmbulanceDetectionSystem:
             'signal_changes': 0,
         }
         
+        # For PyTorch weights on a GPU, replay the forward pass from a CUDA graph instead of launching each kernel
+        self._graph = None
+        if self.device == 'cuda' and isinstance(self.model.model, torch.nn.Module):
+            self._capture_cuda_graph()
+        
+    def _capture_cuda_graph(self):
+        """
+        Captures the model's forward pass for a fixed (batch_size, 3, H, W) input as a CUDA graph.
+
+        Each frame then only copies its pixels into the static input tensor and
+        replays the graph, skipping the per-layer Python and kernel-launch overhead.
+        TensorRT engines don't need this as they already run as a single optimized graph.
+        """
+        try:
+            net = self.model.model.fuse(verbose=False).to(self.device).eval()
+            dtype = torch.float16 if self.half else torch.float32
+            if self.half:
+                net.half()
+            static_in = torch.zeros((self.batch_size, 3, *self.input_shape), device=self.device, dtype=dtype)
+
+            # Warm up on a side stream so lazy initialisation happens before capture
+            stream = torch.cuda.Stream()
+            stream.wait_stream(torch.cuda.current_stream())
+            with torch.no_grad(), torch.cuda.stream(stream):
+                for _ in range(3):
+                    net(static_in)
+            torch.cuda.current_stream().wait_stream(stream)
+
+            graph = torch.cuda.CUDAGraph()
+            with torch.no_grad(), torch.cuda.graph(graph):
+                static_out = net(static_in)
+        except RuntimeError as e:
+            self.logger.warning(f"CUDA graph capture failed, using the standard predictor: {e}")
+            return
+
+        self._graph, self._graph_in, self._graph_out = graph, static_in, static_out
+        # Reusable upload buffers: pinned host memory lets the copy to the GPU run as async DMA
+        self._host_buf = torch.empty((self.batch_size, *self.input_shape, 3), dtype=torch.uint8, pin_memory=True)
+        self._dev_buf = torch.empty_like(self._host_buf, device=self.device)
+        self.static_batch = True
+        self.logger.info("Running inference from a captured CUDA graph")
+
     def detect_in_frame(self, frame):
         """
         Detects ambulances in a single video frame.
@@ -52,70 +352,153 @@ class AmbulanceDetectionSystem:
         Returns:
             A list of dictionaries, where each dictionary represents a detected ambulance.
         """
-        # Perform inference on the frame
-        results = self.model(frame)
-        ambulance_detections = []
-        
-        for result in results:
-            boxes = result.boxes
-            if boxes is not None:
-                for box in boxes:
-                    confidence = float(box.conf)
-                    # Check if the confidence is above our threshold
-                    if confidence > self.confidence_threshold:
-                        class_id = int(box.cls)
-                        class_name = self.model.names[class_id]
-                        
-                        # Check if the detected object is an ambulance
-                        if class_name.lower() == 'ambulance':
-                            x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                            
-                            detection = {
-                                'bbox': [int(x1), int(y1), int(x2), int(y2)],
-                                'confidence': confidence,
-                            }
-                            ambulance_detections.append(detection)
-                            
+        return self.detect_in_frames([frame])[0]
+
+    def detect_in_frames(self, frames):
+        """
+        Detects ambulances in a batch of video frames with a single model call.
+
+        Args:
+            frames: A list of image frames from the video stream.
+
+        Returns:
+            A list with one detection list (as returned by detect_in_frame) per input frame.
+        """
+        batch = list(frames)
+        # Pad a short batch (e.g. the tail of a video) up to the engine's fixed batch size
+        if self.static_batch and len(batch) < self.batch_size:
+            batch += [batch[-1]] * (self.batch_size - len(batch))
+
+        # Letterbox on our side so the predictor receives frames already at the input shape
+        batch = [self._letterbox(frame) for frame in batch]
+
+        # Perform inference on the whole batch at once
+        if self._graph is not None:
+            preds = self._infer_cuda_graph(batch)
+        else:
+            results = self.model(batch, imgsz=self.imgsz, half=self.half, device=self.device, verbose=False)
+            preds = [None if result.boxes is None else result.boxes.data for result in results]
+        return [self._extract_detections(pred) for pred in preds[:len(frames)]]
+
+    def _infer_cuda_graph(self, batch):
+        """
+        Runs letterboxed frames through the captured CUDA graph and applies NMS.
+
+        Returns:
+            One (N, 6) tensor of [x1, y1, x2, y2, conf, cls] rows per frame.
+        """
+        # BGR -> RGB straight into the pinned host buffer, then upload as uint8 (a quarter of the float bytes)
+        host = self._host_buf.numpy()
+        for i, img in enumerate(batch):
+            cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=host[i])
+        self._dev_buf.copy_(self._host_buf, non_blocking=True)
+        
+        # HWC uint8 -> CHW in [0, 1], written into the graph's static input
+        self._graph_in.copy_(self._dev_buf.permute(0, 3, 1, 2))
+        self._graph_in.div_(255)
+
+        self._graph.replay()
+        # Same thresholds as the Ultralytics predictor defaults
+        return ops.non_max_suppression(self._graph_out, conf_thres=0.25, iou_thres=0.7, max_det=300)
+
+    def _letterbox(self, frame):
+        """
+        Resizes and pads a frame to the model input shape, keeping its aspect ratio.
+
+        The scale and padding only depend on the source resolution, so they are
+        computed once and reused for every following frame.
+        """
+        height, width = frame.shape[:2]
+        if self._letterbox_params is None or self._letterbox_params[0] != (height, width):
+            in_h, in_w = self.input_shape
+            gain = min(in_h / height, in_w / width)
+            new_w, new_h = int(round(width * gain)), int(round(height * gain))
+            pad_x, pad_y = (in_w - new_w) / 2, (in_h - new_h) / 2
+            border = (int(round(pad_y - 0.1)), int(round(pad_y + 0.1)),
+                      int(round(pad_x - 0.1)), int(round(pad_x + 0.1)))
+            self._letterbox_params = ((height, width), (new_w, new_h), border, gain)
+
+        _, new_size, (top, bottom, left, right), _ = self._letterbox_params
+        resized = cv2.resize(frame, new_size, interpolation=cv2.INTER_LINEAR)
+        return cv2.copyMakeBorder(resized, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(114, 114, 114))
+
+    def _extract_detections(self, boxes):
+        """
+        Converts one frame's boxes into a list of ambulance detections.
+
+        Args:
+            boxes: (N, 6) tensor of [x1, y1, x2, y2, conf, cls] rows in letterboxed input coordinates, or None.
+        """
+        # Most frames contain nothing; skip the host copy and the filter entirely
+        if boxes is None or len(boxes) == 0:
+            return []
+        
+        # Copy all boxes to the host in a single transfer instead of once per box
+        data = boxes.float().cpu().numpy()
+        xyxy = np.ascontiguousarray(data[:, :4])
+        confs = np.ascontiguousarray(data[:, 4])
+        cls = data[:, 5].astype(np.int32)
+        
+        # Keep confident ambulance boxes, mapped from letterboxed input coordinates back to the frame
+        (height, width), _, (top, _, left, _), gain = self._letterbox_params
+        xyxy, confs = _filter_boxes(xyxy, confs, cls, self.confidence_threshold, self.ambulance_cls_id,
+                                    gain, left, top, width, height)
+        
+        bboxes = xyxy.tolist()
+        ambulance_detections = [None] * len(bboxes)
+        for i, confidence in enumerate(confs.tolist()):
+            ambulance_detections[i] = {'bbox': bboxes[i], 'confidence': confidence}
         return ambulance_detections
     
     def draw_detections(self, frame, detections):
         """
         Draws bounding boxes and labels on the frame for visualization.
+        
+        All boxes and all label backgrounds are each drawn with one cv2.drawContours
+        call, so only the label text is drawn per detection.
         """
-        for detection in detections:
-            bbox = detection['bbox']
-            confidence = detection['confidence']
-            
-            # Draw the bounding box rectangle in red
-            cv2.rectangle(frame, (bbox[0], bbox[1]), (bbox[2], bbox[3]), (0, 0, 255), 2)
-            
-            # Create the label text
-            label = f"AMBULANCE {confidence:.2f}"
-            
-            # Draw a filled background for the label for better visibility
-            label_size, _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)
-            cv2.rectangle(frame, (bbox[0], bbox[1] - label_size[1] - 10), 
-                          (bbox[0] + label_size[0], bbox[1] - 5), (0, 0, 255), -1)
-            
-            # Put the label text on the frame
-            cv2.putText(frame, label, (bbox[0], bbox[1] - 10), 
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+        if not detections:
+            return frame
+        
+        bboxes = np.array([detection['bbox'] for detection in detections], dtype=np.int32)
+        
+        # Filled label backgrounds sit just above the top-left corner of each box
+        label_w, label_h = self.label_size
+        x1, y1 = bboxes[:, 0], bboxes[:, 1]
+        label_bgs = np.stack([x1, y1 - label_h - 10, x1 + label_w, y1 - 5], axis=1)
+        
+        # Draw the bounding box rectangles in red, then the label backgrounds
+        cv2.drawContours(frame, self._rect_contours(bboxes), -1, (0, 0, 255), 2)
+        cv2.drawContours(frame, self._rect_contours(label_bgs), -1, (0, 0, 255), cv2.FILLED)
+        
+        # Put the label texts on the frame
+        for detection, (x, y) in zip(detections, bboxes[:, :2].tolist()):
+            cv2.putText(frame, f"AMBULANCE {detection['confidence']:.2f}", (x, y - 10), 
+                        self.font, 0.6, (255, 255, 255), 2)
             
         return frame
     
+    @staticmethod
+    def _rect_contours(rects):
+        """
+        Converts (N, 4) [x1, y1, x2, y2] rectangles into a list of 4-point contours for cv2.drawContours.
+        """
+        x1, y1, x2, y2 = rects.T
+        corners = np.stack([x1, y1, x2, y1, x2, y2, x1, y2], axis=1)
+        return list(corners.reshape(-1, 4, 1, 2))
+    
     def trigger_emergency_protocol(self):
         """
-        Activates the emergency state: turns the signal GREEN and starts a reset timer.
+        Activates the emergency state: turns the signal GREEN until EMERGENCY_DURATION seconds have passed.
         """
         if not self.emergency_active:
             self.emergency_active = True
             self.traffic_signal_state = "GREEN"
             self.stats['signal_changes'] += 1
             
-            self.logger.info("🚨 EMERGENCY PROTOCOL ACTIVATED - Signal changed to GREEN")
+            self._emergency_until = time.monotonic() + EMERGENCY_DURATION
             
-            # Use a non-blocking timer to reset the protocol after 30 seconds
-            threading.Timer(30.0, self.reset_emergency_protocol).start()
+            self.logger.info("🚨 EMERGENCY PROTOCOL ACTIVATED - Signal changed to GREEN")
     
     def reset_emergency_protocol(self):
         """
@@ -129,60 +512,246 @@ class AmbulanceDetectionSystem:
         """
         Main loop to capture video, process frames, and display the output.
         
+        Decoding, inference and display run as a three-stage pipeline: a reader
+        thread decodes frames into a bounded queue, this thread runs the model and
+        draws the results, and a display thread shows them. The model is only ever
+        called from this thread because the Ultralytics predictor is not reentrant.
+        
+        Frames from a video file are sent to the model in batches of `batch_size`,
+        processing every `frame_stride`-th frame. A live camera or stream is
+        processed one frame at a time, and when inference falls behind only the
+        newest frame is kept, so latency stays constant instead of growing.
+        
         Args:
             source (int or str): Video source. 0 for webcam, or a path to a video file.
         """
-        cap = cv2.VideoCapture(source)
+        live = is_live_source(source)
+        batch_size = 1 if live else self.batch_size
+        cap = open_video_capture(source)
         if not cap.isOpened():
             self.logger.error(f"Failed to open video source: {source}")
             return
+        if isinstance(cap, CudaVideoCapture):
+            self.logger.info("Decoding video on the GPU (NVDEC)")
+        # Don't let the capture backend queue up stale frames
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
         
         self.logger.info("Starting video processing with custom model...")
         fps_counter = deque(maxlen=30)
         
+        # Bounded queues between the stages; None is the end-of-stream sentinel
+        read_q = queue.Queue(maxsize=1 if live else PIPELINE_QUEUE_SIZE)
+        write_q = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        stop = threading.Event()
+        
+        reader = threading.Thread(target=self._read_frames, args=(cap, read_q, stop, live), daemon=True)
+        display = threading.Thread(target=self._display_frames, args=(write_q, stop), daemon=True)
+        reader.start()
+        display.start()
+        
         try:
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    self.logger.warning("End of video stream.")
+            eof = False
+            while not eof and not stop.is_set():
+                # Collect up to batch_size frames, keeping them in capture order
+                pending = []
+                while len(pending) < batch_size:
+                    frame = self._queue_get(read_q, stop)
+                    if frame is None:
+                        eof = True
+                        break
+                    pending.append(frame)
+                
+                if not pending:
                     break
                 
                 start_time = time.time()
                 
-                detections = self.detect_in_frame(frame)
-                
-                if detections:
-                    self.stats['total_detections'] += len(detections)
-                    self.trigger_emergency_protocol()
+                batch_detections = self.detect_in_frames(pending)
+                # Each frame's share of the batch inference time
+                infer_time = (time.time() - start_time) / len(pending)
                 
-                frame = self.draw_detections(frame, detections)
-                self.add_info_overlay(frame)
+                for frame, detections in zip(pending, batch_detections):
+                    # Reset an expired emergency from this thread rather than a timer thread
+                    if self.emergency_active and time.monotonic() >= self._emergency_until:
+                        self.reset_emergency_protocol()
+                    
+                    if detections:
+                        self.stats['total_detections'] += len(detections)
+                        self.trigger_emergency_protocol()
+                    
+                    draw_start = time.time()
+                    frame = self.draw_detections(frame, detections)
+                    self.add_info_overlay(frame)
+                    
+                    # Calculate and display FPS from this frame's inference share plus its own drawing time
+                    processing_time = infer_time + (time.time() - draw_start)
+                    fps = 1.0 / processing_time
+                    fps_counter.append(fps)
+                    avg_fps = sum(fps_counter) / len(fps_counter)
+                    self._put_cached(frame, f"FPS: {avg_fps:.1f}", (10, 30), (0, 255, 0))
+                    
+                    self._queue_put(write_q, frame, stop)
+            
+            if eof and not stop.is_set():
+                self.logger.warning("End of video stream.")
+                        
+        finally:
+            # Let the display drain what is already queued, then shut every stage down
+            self._queue_put(write_q, None, stop)
+            display.join(timeout=DISPLAY_JOIN_TIMEOUT)
+            stop.set()
+            reader.join()
+            cap.release()
+            self.logger.info("Video processing stopped.")
+    
+    def _read_frames(self, cap, read_q, stop, live):
+        """
+        Reader stage: decodes frames into `read_q` until the stream ends or `stop` is set.
+        
+        A live source replaces any frame still waiting in the queue; a video file
+        blocks instead so no frame is lost, skipping frames per `frame_stride`.
+        """
+        try:
+            frame_idx = 0
+            while not stop.is_set():
+                if not live and frame_idx % self.frame_stride:
+                    # grab() advances past the frame without converting it to BGR
+                    frame_idx += 1
+                    if not cap.grab():
+                        break
+                    continue
                 
-                # Calculate and display FPS
-                processing_time = time.time() - start_time
-                fps = 1.0 / processing_time
-                fps_counter.append(fps)
-                avg_fps = sum(fps_counter) / len(fps_counter)
-                cv2.putText(frame, f"FPS: {avg_fps:.1f}", (10, 30), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                frame_idx += 1
                 
+                if live:
+                    self._queue_put_latest(read_q, frame)
+                else:
+                    self._queue_put(read_q, frame, stop)
+        finally:
+            self._queue_put(read_q, None, stop)
+    
+    def _display_frames(self, write_q, stop):
+        """
+        Display stage: shows processed frames from `write_q` and sets `stop` when 'q' is pressed.
+        
+        `stop` is also set if this stage exits for any other reason (e.g. no display
+        available), so the other stages never block on a queue nobody drains.
+        """
+        try:
+            while True:
+                frame = self._queue_get(write_q, stop)
+                if frame is None:
+                    break
                 cv2.imshow('Ambulance Detection System', frame)
                 if cv2.waitKey(1) & 0xFF == ord('q'):
                     break
-                        
         finally:
-            cap.release()
+            stop.set()
             cv2.destroyAllWindows()
-            self.logger.info("Video processing stopped.")
+    
+    @staticmethod
+    def _queue_put(q, item, stop):
+        """
+        Puts `item` on a bounded queue, giving up if `stop` is set while the queue is full.
+        """
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+    
+    @staticmethod
+    def _queue_put_latest(q, item):
+        """
+        Puts `item` on a bounded queue without blocking, discarding the oldest entries to make room.
+        """
+        while True:
+            try:
+                q.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    q.get_nowait()
+                except queue.Empty:
+                    pass
+    
+    @staticmethod
+    def _queue_get(q, stop):
+        """
+        Gets the next item from a queue, returning None if `stop` is set while it is empty.
+        """
+        while not stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return None
+    
+    def _put_cached(self, frame, text, org, color, scale=0.7, thickness=2):
+        """
+        Draws text like cv2.putText, but blits a pre-rendered patch when the same text was drawn before.
+        
+        Args:
+            frame: Image to draw on, modified in place.
+            text (str): Text to draw.
+            org (tuple): Bottom-left corner of the text, as for cv2.putText.
+            color (tuple): BGR text color.
+            scale (float): Font scale.
+            thickness (int): Stroke thickness.
+        """
+        key = (text, color, scale, thickness)
+        cached = self._txt_cache.get(key)
+        if cached is None:
+            (text_w, text_h), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, scale, thickness)
+            # Rasterize the glyphs into their own mask so any color, including black, is drawn;
+            # pad by the stroke thickness so thick glyph edges are not clipped
+            glyphs = np.zeros((text_h + baseline + 2 * thickness, text_w + 2 * thickness), dtype=np.uint8)
+            cv2.putText(glyphs, text, (thickness, text_h + thickness), 
+                        cv2.FONT_HERSHEY_SIMPLEX, scale, 255, thickness)
+            mask = glyphs[:, :, None] > 0
+            patch = np.zeros((*glyphs.shape, 3), dtype=np.uint8)
+            patch[mask[:, :, 0]] = color
+            cached = (patch, mask, text_h + thickness, thickness)
+            self._txt_cache[key] = cached
+            if len(self._txt_cache) > TEXT_CACHE_SIZE:
+                self._txt_cache.popitem(last=False)
+        else:
+            self._txt_cache.move_to_end(key)
+        
+        patch, mask, offset_y, offset_x = cached
+        y, x = org[1] - offset_y, org[0] - offset_x
+        
+        # Clip the patch to the frame, as cv2.putText would clip the text
+        height, width = frame.shape[:2]
+        y0, x0 = max(y, 0), max(x, 0)
+        y1, x1 = min(y + patch.shape[0], height), min(x + patch.shape[1], width)
+        if y0 >= y1 or x0 >= x1:
+            return
+        py, px = y0 - y, x0 - x
+        np.copyto(frame[y0:y1, x0:x1], patch[py:py + y1 - y0, px:px + x1 - x0],
+                  where=mask[py:py + y1 - y0, px:px + x1 - x0])
     
     def add_info_overlay(self, frame):
         """
         Adds a semi-transparent overlay with system status information.
+        
+        Only the panel's region is darkened, and each line is drawn through
+        _put_cached, so a changing detection count re-rasterizes just its own line.
         """
         height, width, _ = frame.shape
-        overlay = frame.copy()
-        cv2.rectangle(overlay, (width - 300, 10), (width - 10, 120), (0, 0, 0), -1)
-        cv2.addWeighted(overlay, 0.6, frame, 0.4, 0, frame)
+        
+        # Darken only the panel region in place
+        panel_h, panel_w = self._dark.shape[:2]
+        left = width - 300
+        # Clip to the frame, as cv2.rectangle would, when the frame is smaller than the panel
+        roi = frame[10:10 + panel_h, max(left, 0):max(left + panel_w, 0)]
+        dark = self._dark[:roi.shape[0], panel_w - roi.shape[1]:]
+        if roi.size:
+            cv2.addWeighted(dark, 0.6, roi, 0.4, 0, roi)
         
         status_color = (0, 255, 0) if self.emergency_active else (255, 255, 255)
         info_text = [
@@ -195,8 +764,7 @@ class AmbulanceDetectionSystem:
         for i, text in enumerate(info_text):
             y_pos = 35 + i * 25
             color = status_color if "ACTIVE" in text or "GREEN" in text else (255, 255, 255)
-            cv2.putText(frame, text, (width - 290, y_pos), 
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+            self._put_cached(frame, text, (width - 290, y_pos), color, scale=0.6)
 
 def main():
     """
@@ -214,15 +782,29 @@ def main():
         print("Please make sure your 'best.pt' file is in the same folder as this script.")
         return
 
+    # Video source: 0 for the default webcam, or a path to a video file
+    video_source = "data2.mp4"
+
+    # Pin the inference shape to the capture so exported models have a single static input shape
+    imgsz = get_inference_shape(video_source)
+    # Batch frames from video files; a live camera or stream is processed frame by frame
+    batch_size = 1 if is_live_source(video_source) else FILE_BATCH_SIZE
+
+    # Prefer a TensorRT engine on NVIDIA GPUs and OpenVINO on CPU; both are built once and reused on later runs
+    if torch.cuda.is_available():
+        exported_path = export_tensorrt_engine(custom_model_path, imgsz, batch=batch_size)
+    else:
+        exported_path = export_openvino_model(custom_model_path, imgsz, batch=batch_size)
+    if exported_path:
+        custom_model_path = exported_path
+
     # Create an instance of the detection system
-    detector = AmbulanceDetectionSystem(model_path=custom_model_path)
+    detector = AmbulanceDetectionSystem(model_path=custom_model_path, imgsz=imgsz, batch_size=batch_size)
     
     print("✅ System initialized successfully!")
     print("📹 Starting video processing... Press 'q' in the video window to quit.")
     
-    # Start processing the video from the default webcam (source=0)
-    # You can also use a video file: source="path/to/your/video.mp4"
-    detector.process_video_stream("data2.mp4")
+    detector.process_video_stream(video_source)
 
     print("👋 System shutdown complete.")
 